@@ -1,33 +1,257 @@
-import json
-import boto3
+import asyncio
+import aioboto3
 import base64
+import logging
+import orjson
 import os
-import uuid
-import time
-import urllib.parse
-
-# Initialize AWS clients outside the handler for potential reuse
-s3_client = boto3.client('s3')
-transcribe_client = boto3.client('transcribe')
-bedrock_runtime = boto3.client('bedrock-runtime')
-polly_client = boto3.client('polly')
+from contextlib import AsyncExitStack
+
+from amazon_transcribe.client import TranscribeStreamingClient
+from amazon_transcribe.handlers import TranscriptResultStreamHandler
+from botocore.config import Config
+
+# Payload dumps (request event, Bedrock bodies) are logged at DEBUG only and
+# truncated, so production invocations don't burn CPU and CloudWatch bytes
+# serializing the base64 audio blob on every request.
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+LOG_PAYLOAD_CHARS = 512 # Truncate logged payloads to this many characters
+
+# Initialize the session outside the handler for potential reuse.
+# One event loop and long-lived clients are kept for the lifetime of the
+# container, so TLS handshakes, DNS lookups and credential resolution are
+# paid once at init (pair with provisioned concurrency on the function so
+# that cost lands before real traffic) rather than on every invocation.
+session = aioboto3.Session()
+_loop = asyncio.new_event_loop()
+_exit_stack = AsyncExitStack()
+_clients = {}
+
+# Shared client settings: TCP keep-alive and a larger connection pool so the
+# repeated S3/Bedrock/Polly calls on the hot path reuse connections instead
+# of paying a fresh TLS handshake, plus adaptive retries.
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+
+async def _get_client(service):
+    """Return a long-lived client for the service, opening it on first use."""
+    if service not in _clients:
+        _clients[service] = await _exit_stack.enter_async_context(
+            session.client(service, config=BOTO_CONFIG))
+    return _clients[service]
 
 # --- Configuration (Retrieve from Environment Variables) ---
 # Make sure to set these in the Lambda function's configuration!
 AUDIO_OUTPUT_BUCKET = os.environ.get('AUDIO_OUTPUT_BUCKET', 'via-assistant-private-audio') # Replace default if needed
-TEMP_UPLOAD_BUCKET = os.environ.get('TEMP_UPLOAD_BUCKET', 'via-assistant-temp-upload-bucket') # Can use the same bucket or a different one
-TEMP_UPLOAD_PREFIX = os.environ.get('TEMP_UPLOAD_PREFIX', 'temp-uploads/') # Folder within the bucket for uploads
 BEDROCK_MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0') # Example: Claude 3 Haiku
 POLLY_VOICE_ID = os.environ.get('POLLY_VOICE_ID', 'Joanna') # Example: Joanna (Neural)
 POLLY_ENGINE = os.environ.get('POLLY_ENGINE', 'neural')
 PRESIGNED_URL_EXPIRY = int(os.environ.get('PRESIGNED_URL_EXPIRY', 300)) # Default: 5 minutes
+AWS_REGION = os.environ.get('AWS_REGION', 'ap-southeast-2') # Set automatically by Lambda
+AUDIO_CHUNK_SIZE = 8 * 1024 # Frame size fed into the Transcribe stream
+
+# Audio contract with the frontend: script.js transcodes the recording to
+# 16 kHz mono 16-bit PCM (TARGET_SAMPLE_RATE there) before sending, and
+# these values declare exactly that to Transcribe. Deliberately not
+# env-tunable - changing one side without the other breaks transcription.
+TRANSCRIBE_SAMPLE_RATE = 16000
+TRANSCRIBE_MEDIA_ENCODING = 'pcm'
+
+# The system prompt (defines the AI's persona and instructions)
+SYSTEM_PROMPT = "You are Via, a friendly, patient, and clear virtual tech voice assistant helping senior citizens. Answer the user's technology question simply and step-by-step if possible. Avoid jargon. Keep responses concise but helpful."
+
+# The Bedrock request body is constant apart from the user's text, so the
+# fixed parts (including the system prompt) are serialized once at import;
+# per request only the transcript itself is JSON-escaped and spliced in.
+# The template is kept as bytes end to end - invoke_model accepts bytes -
+# so there is no str round-trip before the payload hits the wire.
+# Note: For Claude 3, max_tokens refers to the max output tokens. It doesn't
+# use "max_tokens_to_sample" like older Claude models.
+BEDROCK_BODY_TEMPLATE = (
+    b'{"anthropic_version":"bedrock-2023-05-31"' # Required for Claude 3 Messages API
+    b',"max_tokens":1024' # Maximum number of tokens to generate in the response
+    b',"system":' + orjson.dumps(SYSTEM_PROMPT) +
+    b',"messages":[{"role":"user","content":[{"type":"text","text":%s}]}]'
+    b',"temperature":0.7}'
+)
+
+# The streaming client is cheap to build but there is no reason to rebuild
+# it per request either.
+transcribe_streaming_client = TranscribeStreamingClient(region=AWS_REGION)
+
+
+async def _warm_clients():
+    """
+    Open each SDK client and issue one throwaway metadata call so the
+    connection pools are established during init, not on the first request.
+    Failures here are logged and ignored - they only cost warm-up benefit.
+    """
+    for service, ping in (
+        ('s3', lambda c: c.list_buckets()),
+        ('polly', lambda c: c.describe_voices(LanguageCode='en-US')),
+        ('bedrock-runtime', None), # No cheap metadata call; creation still resolves the endpoint
+    ):
+        try:
+            client = await _get_client(service)
+            if ping is not None:
+                await ping(client)
+        except Exception as e:
+            logger.warning("Warm-up for %s client failed: %s", service, e)
+
+
+_loop.run_until_complete(_warm_clients())
+
+
+class TranscriptCollector(TranscriptResultStreamHandler):
+    """
+    Collects the finalized (non-partial) segments from a Transcribe
+    streaming session into a single transcript string.
+    """
+    def __init__(self, transcript_result_stream):
+        super().__init__(transcript_result_stream)
+        self.transcript_parts = []
+
+    async def handle_transcript_event(self, transcript_event):
+        for result in transcript_event.transcript.results:
+            if not result.is_partial:
+                for alt in result.alternatives:
+                    self.transcript_parts.append(alt.transcript)
+
+    @property
+    def transcript_text(self):
+        return " ".join(self.transcript_parts).strip()
+
+
+async def transcribe_audio(audio_bytes):
+    """
+    Streams the in-memory audio straight to Amazon Transcribe Streaming and
+    returns the full transcript. No temporary S3 upload and no polling loop -
+    partial results arrive while the audio is still being consumed.
+    """
+    stream = await transcribe_streaming_client.start_stream_transcription(
+        language_code='en-US',  # Adjust language code if needed
+        media_sample_rate_hz=TRANSCRIBE_SAMPLE_RATE,
+        media_encoding=TRANSCRIBE_MEDIA_ENCODING, # Raw PCM produced by the frontend's transcode step
+    )
+
+    async def send_audio():
+        # Feed the decoded audio to Transcribe in small frames
+        for offset in range(0, len(audio_bytes), AUDIO_CHUNK_SIZE):
+            await stream.input_stream.send_audio_event(audio_chunk=audio_bytes[offset:offset + AUDIO_CHUNK_SIZE])
+        await stream.input_stream.end_stream()
+
+    collector = TranscriptCollector(stream.output_stream)
+    await asyncio.gather(send_audio(), collector.handle_events())
+    return collector.transcript_text
+
+
+async def _run(audio_bytes):
+    """
+    Asynchronous STT -> LLM -> TTS pipeline. Independent network calls are
+    overlapped where possible; returns (llm_response_text, presigned_url).
+    """
+    # --- 2. Transcribe the audio via the streaming API ---
+    # The audio is fed to Transcribe directly from memory, so there is no
+    # temporary S3 upload, no polling loop and no cleanup afterwards.
+    logger.info("Starting streaming transcription...")
+    transcript_text = await transcribe_audio(audio_bytes)
+
+    if not transcript_text:
+         raise ValueError("Transcription returned no text.")
+    logger.info("Transcription complete: %s", transcript_text)
+
+    # --- 3. Send transcript to Bedrock (LLM) ---
+    logger.info("Sending transcript to Bedrock model: %s using Messages API format", BEDROCK_MODEL_ID)
+
+    # Splice the user's transcribed question into the precomputed template;
+    # orjson.dumps handles the JSON escaping of the text itself.
+    request_body = BEDROCK_BODY_TEMPLATE % orjson.dumps(transcript_text)
+
+    logger.debug("Bedrock Request Body: %s", request_body[:LOG_PAYLOAD_CHARS])
+
+    bedrock_runtime = await _get_client('bedrock-runtime')
+    bedrock_response = await bedrock_runtime.invoke_model(
+        body=request_body,
+        modelId=BEDROCK_MODEL_ID,
+        accept='application/json',
+        contentType='application/json'
+    )
+    # orjson.loads accepts bytes directly - no intermediate UTF-8 decode pass
+    response_body = orjson.loads(await bedrock_response['body'].read())
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Bedrock Raw Response Body: %s", str(response_body)[:LOG_PAYLOAD_CHARS])
+
+    # --- For Claude 3 Messages API, the response structure is different ---
+    # The response is in response_body['content'][0]['text']
+    if response_body.get("content") and isinstance(response_body["content"], list) and len(response_body["content"]) > 0:
+        llm_response_text = response_body["content"][0].get("text")
+    else:
+        logger.error("'content' not found or not in expected format in Bedrock response: %s", response_body)
+        llm_response_text = None # Or raise an error
+
+    if not llm_response_text:
+         # Check for error messages from Bedrock
+         if response_body.get("type") == "error":
+              error_details = response_body.get("error", {})
+              error_message = error_details.get("message", "Unknown Bedrock error")
+              logger.error("Bedrock API returned an error: %s", error_message)
+              raise ValueError(f"Bedrock error: {error_message}")
+         raise ValueError("Failed to get completion text from Bedrock Messages API response or response format unexpected.")
+
+    logger.info("Bedrock response received (Messages API): %.100s...", llm_response_text)
+
+
+    # --- 4. Synthesize speech with Polly writing directly to S3 ---
+    # start_speech_synthesis_task returns as soon as the task is queued and
+    # Polly writes the MP3 into the output bucket itself, so the audio never
+    # round-trips through Lambda memory and the response goes back to the
+    # user while synthesis is still running. The frontend retries the fetch
+    # until the object appears (typically under two seconds).
+    polly_client = await _get_client('polly')
+    s3_client = await _get_client('s3')
+    logger.info("Starting speech synthesis task with Polly voice: %s", POLLY_VOICE_ID)
+    polly_response = await polly_client.start_speech_synthesis_task(
+        Text=llm_response_text,
+        OutputFormat='mp3',
+        VoiceId=POLLY_VOICE_ID,
+        Engine=POLLY_ENGINE,
+        OutputS3BucketName=AUDIO_OUTPUT_BUCKET,
+        OutputS3KeyPrefix='via-responses/'
+    )
+
+    # --- 5. Pre-sign the URL of the object Polly will write ---
+    # Polly appends "<TaskId>.mp3" to the prefix; take the key from the
+    # task's OutputUri rather than reconstructing it by hand.
+    output_uri = polly_response['SynthesisTask']['OutputUri']
+    audio_output_key = output_uri.split(f"/{AUDIO_OUTPUT_BUCKET}/", 1)[1]
+    logger.info("Polly is writing audio to s3://%s/%s", AUDIO_OUTPUT_BUCKET, audio_output_key)
+    presigned_url = await s3_client.generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': AUDIO_OUTPUT_BUCKET,
+            'Key': audio_output_key,
+            'ResponseContentType': 'audio/mpeg' # Important for playback
+        },
+        ExpiresIn=PRESIGNED_URL_EXPIRY
+    )
+    logger.debug("Pre-signed URL generated: %.100s...", presigned_url)
+
+    return llm_response_text, presigned_url
+
 
 def lambda_handler(event, context):
     """
     Main Lambda handler function triggered by API Gateway.
     Orchestrates STT -> LLM -> TTS -> S3 Pre-signed URL generation.
     """
-    print("Received event:", json.dumps(event)) # Log the incoming event for debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        # The event includes the whole base64 audio blob - only serialize it
+        # when someone has actually turned DEBUG on.
+        logger.debug("Received event: %s", orjson.dumps(event).decode()[:LOG_PAYLOAD_CHARS])
 
     try:
         # 1. Get Audio Data from the request
@@ -39,7 +263,7 @@ def lambda_handler(event, context):
         # Check if the event body is already base64 decoded by API Gateway (depends on config)
         if event.get('isBase64Encoded', False):
             audio_bytes = base64.b64decode(event['body'])
-            print(f"Decoded base64 audio. Size: {len(audio_bytes)} bytes")
+            logger.info("Decoded base64 audio. Size: %d bytes", len(audio_bytes))
         else:
              # If not base64 encoded, assume it's raw binary or needs different handling
              # For simplicity, this example assumes base64 encoding from the frontend/API Gateway
@@ -47,9 +271,9 @@ def lambda_handler(event, context):
              # Let's try decoding anyway, sometimes API Gateway might not set the flag correctly
              try:
                  audio_bytes = base64.b64decode(event['body'])
-                 print(f"Decoded base64 audio (flag was false/missing). Size: {len(audio_bytes)} bytes")
+                 logger.info("Decoded base64 audio (flag was false/missing). Size: %d bytes", len(audio_bytes))
              except (TypeError, ValueError):
-                 print("Body doesn't seem to be base64 encoded, attempting to use as raw bytes (if applicable)")
+                 logger.warning("Body doesn't seem to be base64 encoded, attempting to use as raw bytes (if applicable)")
                  # If your API Gateway/frontend sends raw binary, you might use event['body'] directly
                  # However, raw binary handling via API Gateway JSON payload can be tricky. Base64 is safer.
                  # For this example's flow, we'll proceed assuming it *should* be base64 for the upload step.
@@ -62,181 +286,12 @@ def lambda_handler(event, context):
         if not audio_bytes:
              raise ValueError("Decoded audio data is empty.")
 
-        # Generate unique names for temporary files/jobs
-        job_id = str(uuid.uuid4())
-        temp_s3_key = f"{TEMP_UPLOAD_PREFIX}{job_id}.wav" # Assuming WAV format from frontend, adjust if needed
-
-        # --- 2. Upload audio to temporary S3 location for Transcribe ---
-        print(f"Uploading received audio to s3://{TEMP_UPLOAD_BUCKET}/{temp_s3_key}")
-        s3_client.put_object(
-            Bucket=TEMP_UPLOAD_BUCKET,
-            Key=temp_s3_key,
-            Body=audio_bytes
-        )
-        temp_s3_uri = f"s3://{TEMP_UPLOAD_BUCKET}/{temp_s3_key}"
-        print(f"Audio uploaded successfully to {temp_s3_uri}")
-
-
-        # --- 3. Start Transcription Job ---
-        # Assuming WAV/MP3/FLAC/Opus etc. Transcribe will try to auto-detect.
-        # Specify MediaFormat if known & needed.
-        transcribe_job_name = f"via-transcription-{job_id}"
-        transcript_output_key = f"transcripts/{transcribe_job_name}.json"
-        print(f"Starting transcription job: {transcribe_job_name}")
-        transcribe_client.start_transcription_job(
-            TranscriptionJobName=transcribe_job_name,
-            LanguageCode='en-US',  # Adjust language code if needed
-            Media={'MediaFileUri': temp_s3_uri},
-            OutputBucketName=TEMP_UPLOAD_BUCKET, # Should use the variable
-            OutputKey=transcript_output_key     # Should use the variable}
-            # Add MediaFormat='wav' (or mp3, ogg, etc.) if auto-detection fails
-        )
-
-        # --- 4. Poll for Transcription Job Completion ---
-        # WARNING: Polling within a single Lambda invocation is simple but can be inefficient
-        # and might hit Lambda timeouts for long audio. Event-driven approach (S3 Event -> Lambda -> Transcribe -> EventBridge -> Lambda)
-        # is better for production but more complex to set up initially.
-        transcript_text = ""
-        max_attempts = 20 # Approx 1 minute with 3 sec wait
-        attempts = 0
-        print("Polling for transcription job completion...")
-        while attempts < max_attempts:
-            attempts += 1
-            job_status = transcribe_client.get_transcription_job(TranscriptionJobName=transcribe_job_name)
-            status = job_status['TranscriptionJob']['TranscriptionJobStatus']
-            print(f"Attempt {attempts}: Job status = {status}")
-
-            if status == 'COMPLETED':
-                transcript_uri = job_status['TranscriptionJob']['Transcript']['TranscriptFileUri']
-                # Download transcript file from S3
-
-                #transcript_response = s3_client.get_object(Bucket=urllib.parse.urlparse(transcript_uri).netloc, Key=urllib.parse.urlparse(transcript_uri).path.lstrip('/'))
-                transcript_response = s3_client.get_object(
-                    Bucket=TEMP_UPLOAD_BUCKET, # Uses the variable
-                    Key=transcript_output_key  # Uses the variable
-                )
-                transcript_data = json.loads(transcript_response['Body'].read().decode('utf-8'))
-                transcript_text = transcript_data['results']['transcripts'][0]['transcript']
-                print(f"Transcription complete: {transcript_text}")
-                break
-            elif status == 'FAILED':
-                print(f"Transcription job failed: {job_status['TranscriptionJob'].get('FailureReason', 'Unknown reason')}")
-                raise Exception(f"Transcription failed: {job_status['TranscriptionJob'].get('FailureReason', 'Unknown reason')}")
-
-            time.sleep(3) # Wait before polling again
-
-        if not transcript_text:
-             raise TimeoutError("Transcription job did not complete in time.")
-
-        # --- (Optional) Delete temporary S3 audio file ---
-        try:
-            print(f"Deleting temporary file: s3://{TEMP_UPLOAD_BUCKET}/{temp_s3_key}")
-            s3_client.delete_object(Bucket=TEMP_UPLOAD_BUCKET, Key=temp_s3_key)
-        except Exception as e:
-            print(f"Warning: Failed to delete temporary S3 file {temp_s3_key}. Error: {e}") # Log error but continue
+        # --- 2-5. Run the async STT -> LLM -> TTS pipeline ---
+        # Reuse the container's event loop so the warm clients (and their
+        # open connections) survive across invocations.
+        llm_response_text, presigned_url = _loop.run_until_complete(_run(audio_bytes))
 
-        # --- (Optional) Delete transcription job ---
-        # Note: Completed jobs are often kept for history, but can be deleted to clean up.
-        try:
-            print(f"Deleting transcription job: {transcribe_job_name}")
-            transcribe_client.delete_transcription_job(TranscriptionJobName=transcribe_job_name)
-        except Exception as e:
-             print(f"Warning: Failed to delete transcription job {transcribe_job_name}. Error: {e}")
-
-
-        # --- 5. Send transcript to Bedrock (LLM) ---
-        print(f"Sending transcript to Bedrock model: {BEDROCK_MODEL_ID} using Messages API format")
-
-        # Construct the system prompt (defines the AI's persona and instructions)
-        system_prompt = "You are Via, a friendly, patient, and clear virtual tech voice assistant helping senior citizens. Answer the user's technology question simply and step-by-step if possible. Avoid jargon. Keep responses concise but helpful."
-
-        # Construct the messages array
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": transcript_text # The user's transcribed question
-                    }
-                ]
-            }
-        ]
-
-        # Note: For Claude 3, max_tokens refers to the max output tokens.
-        # It doesn't use "max_tokens_to_sample" like older Claude models.
-        request_body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31", # Required for Claude 3 Messages API
-            "max_tokens": 1024, # Maximum number of tokens to generate in the response
-            "system": system_prompt,
-            "messages": messages,
-            "temperature": 0.7,
-            # "top_p": 0.9, # Optional: Add other parameters as needed
-            # "top_k": 50,  # Optional
-        })
-
-        print("Bedrock Request Body:", request_body) # Log the request body for debugging
-
-        bedrock_response = bedrock_runtime.invoke_model(
-            body=request_body,
-            modelId=BEDROCK_MODEL_ID,
-            accept='application/json',
-            contentType='application/json'
-        )
-
-        response_body = json.loads(bedrock_response['body'].read())
-        print("Bedrock Raw Response Body:", response_body) # Log the raw response
-
-        # --- For Claude 3 Messages API, the response structure is different ---
-        # The response is in response_body['content'][0]['text']
-        if response_body.get("content") and isinstance(response_body["content"], list) and len(response_body["content"]) > 0:
-            llm_response_text = response_body["content"][0].get("text")
-        else:
-            print("Error: 'content' not found or not in expected format in Bedrock response:", response_body)
-            llm_response_text = None # Or raise an error
-
-        if not llm_response_text:
-             # Check for error messages from Bedrock
-             if response_body.get("type") == "error":
-                  error_details = response_body.get("error", {})
-                  error_message = error_details.get("message", "Unknown Bedrock error")
-                  print(f"Bedrock API returned an error: {error_message}")
-                  raise ValueError(f"Bedrock error: {error_message}")
-             raise ValueError("Failed to get completion text from Bedrock Messages API response or response format unexpected.")
-
-        print(f"Bedrock response received (Messages API): {llm_response_text[:100]}...")
-
-
-        # --- 6. Synthesize LLM response to Speech using Polly ---
-        print(f"Synthesizing text to speech using Polly voice: {POLLY_VOICE_ID}")
-        polly_response = polly_client.synthesize_speech(
-            Text=llm_response_text,
-            OutputFormat='mp3',
-            VoiceId=POLLY_VOICE_ID,
-            Engine=POLLY_ENGINE
-        )
-
-        # --- 7. Upload Polly audio output to S3 ---
-        audio_output_key = f"via-responses/{str(uuid.uuid4())}.mp3"
-        print(f"Uploading Polly audio output to s3://{AUDIO_OUTPUT_BUCKET}/{audio_output_key}")
-        s3_client.put_object(
-            Bucket=AUDIO_OUTPUT_BUCKET,
-            Key=audio_output_key,
-            Body=polly_response['AudioStream'].read(),
-            ContentType='audio/mpeg' # Important for playback
-        )
-
-        # --- 8. Generate Pre-signed URL for the audio output ---
-        print(f"Generating pre-signed URL for s3://{AUDIO_OUTPUT_BUCKET}/{audio_output_key}")
-        presigned_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': AUDIO_OUTPUT_BUCKET, 'Key': audio_output_key},
-            ExpiresIn=PRESIGNED_URL_EXPIRY
-        )
-        print(f"Pre-signed URL generated: {presigned_url[:100]}...")
-
-
-        # --- 9. Format and Return Response for API Gateway ---
+        # --- 6. Format and Return Response for API Gateway ---
         response_payload = {
             'transcript': llm_response_text, # Return the LLM's response text
             'audioUrl': presigned_url
@@ -250,26 +305,11 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,POST'
             },
-            'body': json.dumps(response_payload)
+            'body': orjson.dumps(response_payload).decode()
         }
 
     except Exception as e:
-        print(f"Error processing request: {e}")
-        # Attempt to clean up temporary S3 file if it exists and job started
-        if 'temp_s3_key' in locals():
-             try:
-                  s3_client.delete_object(Bucket=TEMP_UPLOAD_BUCKET, Key=temp_s3_key)
-                  print(f"Cleaned up temporary file: {temp_s3_key}")
-             except Exception as cleanup_e:
-                  print(f"Warning: Failed to cleanup temp file {temp_s3_key} during error handling. Error: {cleanup_e}")
-        # Attempt to delete potentially failed/stuck transcription job
-        if 'transcribe_job_name' in locals():
-             try:
-                  transcribe_client.delete_transcription_job(TranscriptionJobName=transcribe_job_name)
-                  print(f"Cleaned up transcription job: {transcribe_job_name}")
-             except Exception as cleanup_e:
-                  print(f"Warning: Failed to cleanup transcription job {transcribe_job_name} during error handling. Error: {cleanup_e}")
-
+        logger.exception("Error processing request: %s", e)
         return {
             'statusCode': 500,
             'headers': {
@@ -278,5 +318,5 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,POST'
             },
-            'body': json.dumps({'error': f"An error occurred: {str(e)}"})
+            'body': orjson.dumps({'error': f"An error occurred: {str(e)}"}).decode()
         }
\ No newline at end of file
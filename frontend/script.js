@@ -51,10 +51,11 @@ async function startRecording() {
 
 
         audioChunks = []; // Reset chunks
-        // Choose a MIME type that both browser and AWS Transcribe support
-        // Common options: 'audio/webm;codecs=opus', 'audio/wav', 'audio/ogg;codecs=opus'
-        // Let's try webm/opus first, it's widely supported and efficient.
-        // If Transcribe has issues, you might need to try 'audio/wav'.
+        // The recording format only needs to be decodable by this browser:
+        // before upload the audio is transcoded to the raw PCM that the
+        // backend declares to Transcribe streaming (see blobToPcm below).
+        // webm/opus is widely supported and efficient; the fallback default
+        // works too since WebAudio decodes whatever the browser recorded.
         const options = { mimeType: 'audio/webm;codecs=opus' };
         try {
              mediaRecorder = new MediaRecorder(stream, options);
@@ -89,14 +90,15 @@ async function startRecording() {
             stream.getTracks().forEach(track => track.stop()); // Stop the mic access indicator
             mediaRecorder = null;
 
-            // Convert Blob to Base64
+            // Transcode the recording to 16 kHz mono 16-bit PCM - the exact
+            // format the Lambda declares to Transcribe streaming - then
+            // Base64-encode it for the API
             updateStatus('Processing audio...');
             try {
-                 const base64Audio = await blobToBase64(audioBlob);
-                 // console.log("Base64 Audio String (first 100 chars):", base64Audio.substring(0, 100));
-                 sendAudioToApi(base64Audio);
+                 const pcmBuffer = await blobToPcm(audioBlob);
+                 sendAudioToApi(arrayBufferToBase64(pcmBuffer));
             } catch (error) {
-                 console.error("Error converting Blob to Base64:", error);
+                 console.error("Error converting recording to PCM:", error);
                  updateStatus('Error processing audio.', true);
                  resetMicButton();
             }
@@ -187,14 +189,23 @@ async function sendAudioToApi(base64AudioString) {
     }
 }
 
-function displayResponse(data) {
+async function displayResponse(data) {
     if (data.transcript && data.audioUrl) {
+        // Show the text answer right away; the audio is loaded separately
+        // because Polly writes it to S3 asynchronously and the object may
+        // not exist for the first second or two.
         transcriptOutput.textContent = data.transcript;
-        audioPlayer.src = data.audioUrl;
-        audioPlayer.style.display = 'block'; // Show audio player
-        // audioPlayer.play(); // Autoplay might be blocked by browsers, let user click play
         responseArea.style.display = 'block'; // Show the response area
-        updateStatus('Response loaded. Press play to listen.'); // Update status
+        updateStatus('Answer ready. Loading audio...');
+        try {
+            await loadAudioWithRetry(audioPlayer, data.audioUrl);
+            audioPlayer.style.display = 'block'; // Show audio player
+            // audioPlayer.play(); // Autoplay might be blocked by browsers, let user click play
+            updateStatus('Response loaded. Press play to listen.'); // Update status
+        } catch (error) {
+            console.error('Error loading response audio:', error);
+            updateStatus('Answer ready, but the audio could not be loaded.', true);
+        }
     } else {
         console.error("Invalid response data structure:", data);
         updateStatus('Received an invalid response from the assistant.', true);
@@ -204,6 +215,48 @@ function displayResponse(data) {
 
 // --- Helper Functions ---
 
+// Loads the response audio through the <audio> element itself, retrying
+// while Polly is still writing the object to S3. The synthesis task is an
+// async batch API with no scheduling SLA - short text usually lands within
+// a couple of seconds, but tasks can sit queued for several more, so back
+// off from 500 ms to 2 s and keep trying for ~25 s (well within the
+// 5-minute presign expiry) rather than surfacing a failure for audio that
+// is moments away. Media element loads are no-cors requests, so unlike
+// fetch() this needs no CORS configuration on the audio bucket.
+function loadAudioWithRetry(player, url, maxWaitMs = 25000) {
+    const deadline = Date.now() + maxWaitMs;
+    let delayMs = 500;
+    let attempt = 0;
+    return new Promise((resolve, reject) => {
+        const cleanup = () => {
+            player.removeEventListener('canplay', onReady);
+            player.removeEventListener('error', onError);
+        };
+        const onReady = () => {
+            cleanup();
+            resolve();
+        };
+        const onError = () => {
+            if (Date.now() >= deadline) {
+                cleanup();
+                reject(new Error('Audio was not available after retrying.'));
+                return;
+            }
+            attempt++;
+            console.log(`Audio not ready yet (attempt ${attempt}), retrying...`);
+            setTimeout(() => {
+                player.src = url; // Re-setting src restarts the media load
+                player.load();
+            }, delayMs);
+            delayMs = Math.min(delayMs * 2, 2000);
+        };
+        player.addEventListener('canplay', onReady);
+        player.addEventListener('error', onError);
+        player.src = url;
+        player.load();
+    });
+}
+
 function updateStatus(message, isError = false) {
     statusMessage.textContent = message;
     statusMessage.className = isError ? 'status-message error' : 'status-message';
@@ -217,19 +270,51 @@ function resetMicButton() {
     // Keep status message as is unless explicitly cleared or updated elsewhere
 }
 
-// Converts a Blob object to a Base64 encoded string
-function blobToBase64(blob) {
-    return new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onerror = (event) => {
-             console.error("FileReader error:", event.target.error);
-             reject(new Error("Error reading Blob: " + event.target.error));
-        };
-        reader.onload = () => {
-            resolve(reader.result); // result contains the Base64 encoded string with data URI prefix
-        };
-        reader.readAsDataURL(blob);
-    });
+// Must match TRANSCRIBE_SAMPLE_RATE in the backend Lambda - the bytes sent
+// are declared to Transcribe as raw PCM at this rate.
+const TARGET_SAMPLE_RATE = 16000;
+
+// Decodes the recorded Blob (whatever container/codec the browser used)
+// and resamples it to 16 kHz mono 16-bit PCM, the format the backend
+// declares when it opens the Transcribe stream.
+async function blobToPcm(blob) {
+    const encodedBuffer = await blob.arrayBuffer();
+    const decodeCtx = new (window.AudioContext || window.webkitAudioContext)();
+    let audioBuffer;
+    try {
+        audioBuffer = await decodeCtx.decodeAudioData(encodedBuffer);
+    } finally {
+        decodeCtx.close();
+    }
+
+    // Resample (and mix down to mono) via an OfflineAudioContext
+    const offlineCtx = new OfflineAudioContext(1, Math.ceil(audioBuffer.duration * TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE);
+    const source = offlineCtx.createBufferSource();
+    source.buffer = audioBuffer;
+    source.connect(offlineCtx.destination);
+    source.start();
+    const resampled = await offlineCtx.startRendering();
+
+    // Convert Float32 samples [-1, 1] to signed 16-bit little-endian PCM
+    const samples = resampled.getChannelData(0);
+    const pcm = new Int16Array(samples.length);
+    for (let i = 0; i < samples.length; i++) {
+        const s = Math.max(-1, Math.min(1, samples[i]));
+        pcm[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
+    }
+    return pcm.buffer;
+}
+
+// Base64-encodes an ArrayBuffer in chunks (avoids call-stack limits on
+// String.fromCharCode for longer recordings)
+function arrayBufferToBase64(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const chunkSize = 0x8000;
+    let binary = '';
+    for (let i = 0; i < bytes.length; i += chunkSize) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + chunkSize));
+    }
+    return btoa(binary);
 }
 
 // --- Initial State ---